@@ -7,6 +7,26 @@ DATABASE_NAME = "Estacao_ESP32_database"
 TABLE_NAME = "telemetria"
 AWS_REGION = "us-east-1"
 
+# Fonte de dados do dashboard: "timestream" ou "local"
+DATA_SOURCE = "timestream"
+
+# Configuração do armazenamento local (SQLite)
+LOCAL_DB_PATH = "data/telemetria_local.db"
+
+# Configuração do serviço de ingestão local
+INGEST_HOST = "127.0.0.1"
+INGEST_PORT = 8080
+INGEST_BATCH_SIZE = 500          # registros por transação
+INGEST_FLUSH_INTERVAL = 0.05     # segundos máximos de espera para completar um lote
+INGEST_QUEUE_MAXSIZE = 100000    # registros em buffer antes de recusar novos
+INGEST_MAX_FUTURE_SECONDS = 300  # tolerância para relógios adiantados das estações
+INGEST_MAX_AGE_DAYS = 365        # registros mais antigos que isso são recusados
+
+# Configuração MQTT (opcional, requer paho-mqtt)
+MQTT_HOST = "127.0.0.1"
+MQTT_PORT = 1883
+MQTT_TOPIC = "estacao/telemetria"
+
 # Configurações de período
 PERIOD_OPTIONS = {
     "1 hora": 1,
@@ -0,0 +1,81 @@
+"""
+Módulo para leitura da telemetria gravada pelo serviço de ingestão local
+
+As leituras não usam cache: consultas no SQLite local são baratas e o objetivo
+é que um registro apareça no dashboard em menos de 1 segundo.
+"""
+import time
+import streamlit as st
+import pandas as pd
+from src.config.settings import LOCAL_DB_PATH, TABLE_NAME
+from src.data.local_store import connect, init_schema, time_window_ms
+
+@st.cache_resource
+def init_local_client(db_path=LOCAL_DB_PATH):
+    """Garante que o banco local existe e retorna seu caminho"""
+    try:
+        conn = connect(db_path)
+        try:
+            init_schema(conn)
+        finally:
+            conn.close()
+        return db_path
+    except Exception as e:
+        st.error(f"Erro ao inicializar o banco local: {e}. Verifique o caminho {db_path}.")
+        return None
+
+def _query(db_path, query, params):
+    """Executa a consulta no banco local e converte a coluna de tempo"""
+    conn = connect(db_path)
+    try:
+        df = pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+    for col in ["time", "last_seen"]:
+        if col in df.columns:
+            # Valores fora do intervalo suportado pelo pandas viram NaT e são descartados
+            df[col] = pd.to_datetime(df[col], unit="ms", utc=True, errors="coerce").dt.tz_convert('America/Sao_Paulo')
+            df = df.dropna(subset=[col])
+    return df
+
+def get_all_stations_latest_data(db_path):
+    """Obtém os últimos dados de todas as estações ativas"""
+    if not db_path:
+        return pd.DataFrame()
+    query = f"""
+    SELECT t.device_id, t.latitude, t.longitude, t.time as last_seen
+    FROM {TABLE_NAME} t
+    JOIN (
+        SELECT device_id, MAX(time) as max_time
+        FROM {TABLE_NAME}
+        WHERE time BETWEEN ? AND ? AND latitude IS NOT NULL AND longitude IS NOT NULL
+        GROUP BY device_id
+    ) latest ON t.device_id = latest.device_id AND t.time = latest.max_time
+    WHERE t.latitude IS NOT NULL AND t.longitude IS NOT NULL
+    GROUP BY t.device_id
+    """
+    since_ms = int((time.time() - 24 * 3600) * 1000)
+    _, newest_ms = time_window_ms()
+    try:
+        return _query(db_path, query, (since_ms, newest_ms))
+    except Exception as e:
+        st.error(f"Erro ao buscar dados das estações: {e}")
+        return pd.DataFrame()
+
+def get_station_details(db_path, device_id, period_hours=24):
+    """Obtém dados detalhados para uma estação específica"""
+    if not db_path:
+        return pd.DataFrame()
+    query = f"""
+    SELECT time, device_id, temperatura, umidade, pressao, altitude, mq135_analog, fonte_localizacao
+    FROM {TABLE_NAME}
+    WHERE device_id = ? AND time BETWEEN ? AND ?
+    ORDER BY time DESC
+    """
+    since_ms = int((time.time() - period_hours * 3600) * 1000)
+    _, newest_ms = time_window_ms()
+    try:
+        return _query(db_path, query, (device_id, since_ms, newest_ms))
+    except Exception as e:
+        st.error(f"Erro ao buscar detalhes da estação {device_id}: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,136 @@
+"""
+Armazenamento local (SQLite) para a telemetria das estações
+"""
+import math
+import os
+import sqlite3
+import time
+from datetime import datetime
+from src.config.settings import LOCAL_DB_PATH, TABLE_NAME, INGEST_MAX_FUTURE_SECONDS, INGEST_MAX_AGE_DAYS
+
+NUMERIC_FIELDS = ["temperatura", "umidade", "pressao", "altitude", "mq135_analog", "latitude", "longitude"]
+
+# Nomes alternativos aceitos no payload das estações
+FIELD_ALIASES = {"lat": "latitude", "lon": "longitude", "lng": "longitude"}
+
+COLUMNS = ["time", "device_id"] + NUMERIC_FIELDS + ["fonte_localizacao"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+    time INTEGER NOT NULL,
+    device_id TEXT NOT NULL,
+    temperatura REAL,
+    umidade REAL,
+    pressao REAL,
+    altitude REAL,
+    mq135_analog REAL,
+    latitude REAL,
+    longitude REAL,
+    fonte_localizacao TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_device_time ON {TABLE_NAME} (device_id, time);
+CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_time ON {TABLE_NAME} (time);
+"""
+
+
+def connect(db_path=LOCAL_DB_PATH, check_same_thread=True, timeout=5.0):
+    """Abre uma conexão SQLite em modo WAL (leituras não bloqueiam a escrita)"""
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def init_schema(conn):
+    """Cria a tabela de telemetria e os índices, se ainda não existirem"""
+    conn.executescript(SCHEMA)
+    conn.commit()
+
+
+def time_window_ms(now=None):
+    """Intervalo de tempo (epoch ms) aceito para os registros, relativo ao relógio do servidor"""
+    now = time.time() if now is None else now
+    oldest = int((now - INGEST_MAX_AGE_DAYS * 24 * 3600) * 1000)
+    newest = int((now + INGEST_MAX_FUTURE_SECONDS) * 1000)
+    return oldest, newest
+
+
+def _to_time_ms(value):
+    """Converte o campo de tempo (epoch s/ms ou ISO 8601) para epoch em milissegundos"""
+    if isinstance(value, bool):
+        raise ValueError("campo 'time' inválido")
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError("campo 'time' deve ser finito")
+        # Valores abaixo de 1e11 são tratados como segundos
+        return int(value * 1000) if abs(value) < 1e11 else int(value)
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        number = None
+    if number is not None:
+        return _to_time_ms(number)
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        return int(parsed.timestamp() * 1000)
+    except (ValueError, OverflowError, OSError):
+        raise ValueError("campo 'time' deve ser epoch ou data ISO 8601")
+
+
+def _parse_time_ms(value):
+    """Converte o campo de tempo e recusa valores fora da janela aceita"""
+    if value is None or value == "":
+        return int(time.time() * 1000)
+    time_ms = _to_time_ms(value)
+    oldest, newest = time_window_ms()
+    if not oldest <= time_ms <= newest:
+        raise ValueError(
+            f"campo 'time' fora do intervalo permitido (até {INGEST_MAX_AGE_DAYS} dias atrás "
+            f"e {INGEST_MAX_FUTURE_SECONDS} s à frente do servidor)"
+        )
+    return time_ms
+
+
+def normalize_record(payload):
+    """Valida um registro no formato da tabela telemetria e retorna a tupla para inserção"""
+    if not isinstance(payload, dict):
+        raise ValueError("registro deve ser um objeto JSON")
+    record = {FIELD_ALIASES.get(key, key): value for key, value in payload.items()}
+
+    device_id = record.get("device_id")
+    if device_id is None or str(device_id).strip() == "":
+        raise ValueError("campo 'device_id' é obrigatório")
+
+    values = {"device_id": str(device_id), "time": _parse_time_ms(record.get("time"))}
+    for field in NUMERIC_FIELDS:
+        value = record.get(field)
+        if value is None or value == "":
+            values[field] = None
+        else:
+            try:
+                number = float(value)
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError(f"campo '{field}' deve ser numérico")
+            if isinstance(value, bool) or not math.isfinite(number):
+                raise ValueError(f"campo '{field}' deve ser numérico e finito")
+            values[field] = number
+    fonte = record.get("fonte_localizacao")
+    values["fonte_localizacao"] = None if fonte is None else str(fonte)
+    return tuple(values[col] for col in COLUMNS)
+
+
+def insert_rows(conn, rows):
+    """Grava um lote de registros normalizados em uma única transação"""
+    if not rows:
+        return 0
+    placeholders = ", ".join("?" for _ in COLUMNS)
+    with conn:
+        conn.executemany(
+            f"INSERT INTO {TABLE_NAME} ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+            rows,
+        )
+    return len(rows)
@@ -0,0 +1,3 @@
+"""
+Pacote de ingestão local de telemetria
+"""
\ No newline at end of file
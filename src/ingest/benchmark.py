@@ -0,0 +1,107 @@
+# Para rodar esse arquivo:
+# python -m src.ingest.benchmark
+
+"""
+Benchmark do serviço de ingestão local (vazão e atualização), inteiramente em localhost
+
+As verificações de correção ficam em tests/test_ingest.py.
+"""
+import argparse
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from src.data.local_client import get_station_details
+from src.ingest.server import BatchWriter, make_handler
+
+
+def sample_record(device_id, index=0):
+    """Registro no formato enviado pelas estações"""
+    return {
+        "device_id": device_id,
+        "temperatura": 20 + index % 10,
+        "umidade": 60.0,
+        "pressao": 1013.0,
+        "altitude": 760.0,
+        "mq135_analog": 900,
+        "lat": -23.59,
+        "lon": -46.68,
+        "fonte_localizacao": "gps",
+    }
+
+
+def post(conn, body):
+    """Faz um POST /telemetria numa conexão keep-alive; falha se não for aceito"""
+    conn.request("POST", "/telemetria", body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    content = response.read()
+    if response.status != 202:
+        raise RuntimeError(f"POST retornou {response.status}: {content.decode('utf-8', 'replace')}")
+
+
+def wait_until(condition, timeout=10.0):
+    """Espera a condição ficar verdadeira; falha se o prazo acabar"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if condition():
+            return
+        time.sleep(0.001)
+    raise RuntimeError(f"condição não atingida em {timeout:.0f}s")
+
+
+def measure_throughput(conn, writer, requests, batch_size):
+    """Envia lotes de registros e mede a vazão até estarem gravados no banco"""
+    body = json.dumps([sample_record("bench", i) for i in range(batch_size)])
+    total = requests * batch_size
+    start_written = writer.written
+    start = time.perf_counter()
+    for _ in range(requests):
+        post(conn, body)
+    wait_until(lambda: writer.written - start_written >= total)
+    elapsed = time.perf_counter() - start
+    print(f"ingestão em lotes: {total} registros em {elapsed:.2f}s ({total / elapsed:,.0f} registros/s, "
+          f"medido até a gravação)")
+
+
+def measure_freshness(conn, db_path, samples):
+    """Mede o tempo entre o POST e o registro aparecer em local_client.get_station_details"""
+    latencies = []
+    for i in range(samples):
+        device_id = f"fresh-{i}"
+        start = time.perf_counter()
+        post(conn, json.dumps(sample_record(device_id)))
+        wait_until(lambda: not get_station_details(db_path, device_id, 1).empty)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"leitura após escrita (local_client): mediana {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+          f"máximo {latencies[-1] * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da ingestão local")
+    parser.add_argument("--requests", type=int, default=100, help="número de POSTs em lote")
+    parser.add_argument("--batch-size", type=int, default=500, help="registros por POST")
+    parser.add_argument("--samples", type=int, default=20, help="medições de leitura após escrita")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "telemetria_bench.db")
+        writer = BatchWriter(db_path=db_path).start()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(writer))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        try:
+            measure_throughput(conn, writer, args.requests, args.batch_size)
+            measure_freshness(conn, db_path, args.samples)
+        finally:
+            conn.close()
+            server.shutdown()
+            server.server_close()
+            writer.stop()
+
+
+if __name__ == "__main__":
+    main()
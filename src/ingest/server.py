@@ -0,0 +1,288 @@
+# Para rodar esse arquivo:
+# python -m src.ingest.server --mqtt
+
+"""
+Serviço local de ingestão da telemetria das estações ESP32 (HTTP e MQTT opcional)
+"""
+import argparse
+import json
+import queue
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.config.settings import (
+    LOCAL_DB_PATH, INGEST_HOST, INGEST_PORT, INGEST_BATCH_SIZE, INGEST_FLUSH_INTERVAL,
+    INGEST_QUEUE_MAXSIZE, MQTT_HOST, MQTT_PORT, MQTT_TOPIC
+)
+from src.data.local_store import connect, init_schema, insert_rows, normalize_record
+
+
+# Erros causados pelo conteúdo do registro: só o registro é descartado
+DATA_ERRORS = (OverflowError, sqlite3.IntegrityError, sqlite3.InterfaceError)
+
+# Espera entre tentativas quando o banco está temporariamente indisponível
+RETRY_BACKOFF_START = 0.1
+RETRY_BACKOFF_MAX = 5.0
+RETRY_ATTEMPTS_ON_STOP = 5
+
+
+def _reject_constant(name):
+    raise ValueError(f"valor não numérico não permitido: {name}")
+
+
+def loads_strict(data):
+    """json.loads que recusa NaN e Infinity"""
+    return json.loads(data, parse_constant=_reject_constant)
+
+
+class BatchWriter:
+    """Bufferiza registros e os grava no SQLite em lotes, numa thread dedicada"""
+
+    def __init__(self, db_path=LOCAL_DB_PATH, batch_size=INGEST_BATCH_SIZE,
+                 flush_interval=INGEST_FLUSH_INTERVAL, maxsize=INGEST_QUEUE_MAXSIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._submit_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="batch-writer", daemon=True)
+        self._conn = None
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+
+    def start(self):
+        """Abre o banco antes de iniciar a thread, para que falhas apareçam na inicialização"""
+        # A conexão é criada aqui e usada somente pela thread de escrita
+        self._conn = connect(self.db_path, check_same_thread=False)
+        init_schema(self._conn)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Encerra a thread após gravar o que ainda está no buffer"""
+        self._stop.set()
+        self._thread.join()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def submit(self, payloads):
+        """Valida e enfileira registros; aceita todos ou nenhum e retorna quantos foram aceitos"""
+        if not self.is_alive():
+            raise RuntimeError("thread de gravação não está ativa")
+        rows = [normalize_record(payload) for payload in payloads]
+        if len(rows) > self._queue.maxsize:
+            raise ValueError(f"lote de {len(rows)} registros maior que o buffer ({self._queue.maxsize})")
+        # Só os produtores enchem a fila; a thread de gravação apenas libera espaço
+        with self._submit_lock:
+            if self._queue.maxsize - self._queue.qsize() < len(rows):
+                return 0
+            for row in rows:
+                self._queue.put_nowait(row)
+        return len(rows)
+
+    def _collect(self):
+        """Aguarda o primeiro registro e junta outros até completar o lote ou o prazo"""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert_with_retry(self, rows):
+        """Grava as linhas, repetindo com espera crescente enquanto o banco estiver indisponível"""
+        delay = RETRY_BACKOFF_START
+        attempts = 0
+        while True:
+            try:
+                return insert_rows(self._conn, rows)
+            except sqlite3.OperationalError as e:
+                attempts += 1
+                if self._stop.is_set() and attempts >= RETRY_ATTEMPTS_ON_STOP:
+                    raise
+                print(f"Banco indisponível ao gravar {len(rows)} registros ({e}); nova tentativa em {delay:.1f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, RETRY_BACKOFF_MAX)
+
+    def _write(self, batch):
+        """Grava o lote; se um registro for inválido, grava um a um e descarta só os inválidos"""
+        try:
+            self.written += self._insert_with_retry(batch)
+            self.batches += 1
+            return
+        except DATA_ERRORS as e:
+            print(f"Registro inválido no lote de {len(batch)} registros, gravando um a um: {e}")
+        except sqlite3.OperationalError as e:
+            self.failed += len(batch)
+            print(f"Lote de {len(batch)} registros descartado ao encerrar: {e}")
+            return
+        for row in batch:
+            try:
+                self.written += self._insert_with_retry([row])
+            except DATA_ERRORS as e:
+                self.failed += 1
+                print(f"Registro descartado ({row[1]}, time={row[0]}): {e}")
+            except sqlite3.OperationalError as e:
+                self.failed += 1
+                print(f"Registro descartado ao encerrar ({row[1]}, time={row[0]}): {e}")
+        self.batches += 1
+
+    def _run(self):
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = self._collect()
+                if batch:
+                    self._write(batch)
+        finally:
+            self._conn.close()
+
+
+def make_handler(writer):
+    """Cria o handler HTTP ligado ao BatchWriter informado"""
+
+    class IngestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_body(self):
+            """Lê o corpo pelo Content-Length; retorna None (e fecha a conexão) se inválido"""
+            try:
+                length = int(self.headers["Content-Length"])
+            except (TypeError, ValueError):
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                return None
+            return self.rfile.read(length)
+
+        def do_GET(self):
+            if self.path != "/health":
+                self._send_json(404, {"erro": "rota não encontrada"})
+                return
+            self._send_json(200 if writer.is_alive() else 503, {
+                "ativo": writer.is_alive(),
+                "pendentes": writer.pending(),
+                "gravados": writer.written,
+                "descartados": writer.failed,
+                "lotes": writer.batches,
+            })
+
+        def do_POST(self):
+            # O corpo é sempre consumido antes de responder, para manter o keep-alive consistente
+            body = self._read_body()
+            if body is None:
+                self._send_json(411, {"erro": "Content-Length ausente ou inválido"})
+                return
+            if self.path != "/telemetria":
+                self._send_json(404, {"erro": "rota não encontrada"})
+                return
+            try:
+                payload = loads_strict(body or b"null")
+                payloads = payload if isinstance(payload, list) else [payload]
+                accepted = writer.submit(payloads)
+            except (ValueError, TypeError) as e:
+                self._send_json(400, {"erro": str(e)})
+                return
+            except RuntimeError as e:
+                self._send_json(503, {"erro": str(e)})
+                return
+            if accepted < len(payloads):
+                # Nenhum registro foi enfileirado: o cliente pode reenviar sem duplicar dados
+                self._send_json(503, {"erro": "buffer cheio", "aceitos": 0})
+                return
+            self._send_json(202, {"aceitos": accepted})
+
+        def log_message(self, format, *args):
+            # Evita uma linha de log por requisição em alta taxa de ingestão
+            pass
+
+    return IngestHandler
+
+
+def start_mqtt(writer, host=MQTT_HOST, port=MQTT_PORT, topic=MQTT_TOPIC):
+    """Assina o tópico MQTT e repassa as mensagens ao BatchWriter (requer paho-mqtt)"""
+    try:
+        import paho.mqtt.client as mqtt
+    except ImportError:
+        raise RuntimeError("paho-mqtt não está instalado. Instale com: pip install paho-mqtt")
+
+    def on_message(client, userdata, message):
+        try:
+            payload = loads_strict(message.payload)
+            payloads = payload if isinstance(payload, list) else [payload]
+            accepted = writer.submit(payloads)
+        except (ValueError, TypeError) as e:
+            print(f"Mensagem MQTT inválida em {message.topic}: {e}")
+            return
+        except RuntimeError as e:
+            print(f"Mensagem MQTT descartada em {message.topic}: {e}")
+            return
+        if accepted < len(payloads):
+            print(f"Buffer cheio: {len(payloads)} registros MQTT descartados em {message.topic}")
+
+    if hasattr(mqtt, "CallbackAPIVersion"):
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    else:
+        client = mqtt.Client()
+    client.on_message = on_message
+    client.connect(host, port)
+    client.subscribe(topic)
+    client.loop_start()
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de ingestão de telemetria")
+    parser.add_argument("--host", default=INGEST_HOST)
+    parser.add_argument("--port", type=int, default=INGEST_PORT)
+    parser.add_argument("--db", default=LOCAL_DB_PATH)
+    parser.add_argument("--mqtt", action="store_true", help="assina também o tópico MQTT")
+    parser.add_argument("--mqtt-host", default=MQTT_HOST)
+    parser.add_argument("--mqtt-port", type=int, default=MQTT_PORT)
+    parser.add_argument("--mqtt-topic", default=MQTT_TOPIC)
+    args = parser.parse_args()
+
+    writer = BatchWriter(db_path=args.db).start()
+    mqtt_client = None
+    if args.mqtt:
+        mqtt_client = start_mqtt(writer, args.mqtt_host, args.mqtt_port, args.mqtt_topic)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(writer))
+    print(f"Ingestão local em http://{args.host}:{args.port}/telemetria -> {args.db}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if mqtt_client is not None:
+            mqtt_client.loop_stop()
+            mqtt_client.disconnect()
+        writer.stop()
+
+
+if __name__ == "__main__":
+    main()
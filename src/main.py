@@ -6,8 +6,13 @@ Dashboard principal para visualização de dados das estações meteorológicas
 """
 import streamlit as st
 import pandas as pd
-from src.config.settings import PERIOD_OPTIONS
-from src.data.timestream_client import init_timestream_client, get_all_stations_latest_data, get_station_details
+from src.config.settings import PERIOD_OPTIONS, DATA_SOURCE
+if DATA_SOURCE == "local":
+    from src.data.local_client import init_local_client as init_client, get_all_stations_latest_data, get_station_details
+    SOURCE_NAME = "banco local (SQLite)"
+else:
+    from src.data.timestream_client import init_timestream_client as init_client, get_all_stations_latest_data, get_station_details
+    SOURCE_NAME = "Timestream"
 from src.visualization.cards import render_weather_cards
 from src.visualization.gauges import render_gauge_indicators
 from src.visualization.charts import create_dual_axis_chart
@@ -39,17 +44,17 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 def main():
-    # Inicializa o cliente Timestream
-    ts_query_client = init_timestream_client()
+    # Inicializa o cliente da fonte de dados configurada
+    data_client = init_client()
     st.title("🛰️ Dashboard de Estações Meteorológicas")
 
-    stations_df = get_all_stations_latest_data(ts_query_client)
+    stations_df = get_all_stations_latest_data(data_client)
     selected_device_id = None
 
-    if ts_query_client is None:
-        st.error("Cliente Timestream não inicializado. O dashboard não pode funcionar.")
+    if data_client is None:
+        st.error(f"Cliente do {SOURCE_NAME} não inicializado. O dashboard não pode funcionar.")
     elif stations_df.empty:
-        st.warning("Nenhuma estação com dados de localização recentes (último dia) encontrada. Verifique a conexão e se há dados no Timestream.")
+        st.warning(f"Nenhuma estação com dados de localização recentes (último dia) encontrada. Verifique a conexão e se há dados no {SOURCE_NAME}.")
     else:
         st.sidebar.header("Selecionar Estação")
         if "selected_device_id" not in st.session_state or st.session_state.selected_device_id not in stations_df["device_id"].unique():
@@ -65,7 +70,7 @@ def main():
 
         st.subheader("Localização das Estações")
         st.map(stations_df[["latitude", "longitude"]])
-        st.caption(f"Fonte da Localização: {(get_station_details(ts_query_client, selected_device_id).iloc[0]).get('fonte_localizacao', 'N/A')}")
+        st.caption(f"Fonte da Localização: {(get_station_details(data_client, selected_device_id).iloc[0]).get('fonte_localizacao', 'N/A')}")
 
     if selected_device_id:
         st.subheader(f"Dados da Estação: {selected_device_id} (Período Selecionado)")
@@ -78,7 +83,7 @@ def main():
         )
         period_hours = PERIOD_OPTIONS[selected_period]
         
-        station_details_df = get_station_details(ts_query_client, selected_device_id, period_hours)
+        station_details_df = get_station_details(data_client, selected_device_id, period_hours)
 
         if station_details_df.empty:
             st.warning(f"Nenhum dado detalhado encontrado para a estação {selected_device_id} no período selecionado. Verifique se a estação está enviando dados.")
@@ -136,7 +141,7 @@ def main():
             else:
                 st.info("Coluna 'time' ou dados insuficientes para o gráfico de histórico.")
     else:
-        if ts_query_client and not stations_df.empty:
+        if data_client and not stations_df.empty:
             st.info("Selecione uma estação na barra lateral para ver os detalhes.")
 
     st.sidebar.markdown("_Desenvolvido por Vitor e Jerônimo_ \n"
@@ -0,0 +1,196 @@
+"""
+Testes do serviço de ingestão local, executados inteiramente em localhost
+"""
+import functools
+import http.client
+import json
+import sqlite3
+import threading
+import time
+import pytest
+from http.server import ThreadingHTTPServer
+from src.data import local_store
+from src.data.local_client import get_all_stations_latest_data, get_station_details
+from src.data.local_store import connect, insert_rows, normalize_record
+from src.ingest import server
+from src.ingest.server import BatchWriter, make_handler
+
+
+def sample_record(device_id, **fields):
+    record = {
+        "device_id": device_id,
+        "temperatura": 25.0,
+        "umidade": 60.0,
+        "pressao": 1013.0,
+        "altitude": 760.0,
+        "mq135_analog": 900,
+        "lat": -23.59,
+        "lon": -46.68,
+        "fonte_localizacao": "gps",
+    }
+    record.update(fields)
+    return record
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def count_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM telemetria").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "telemetria.db")
+
+
+@pytest.fixture
+def writer(db_path):
+    writer = BatchWriter(db_path=db_path).start()
+    yield writer
+    writer.stop()
+
+
+@pytest.fixture
+def http_conn(writer):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(writer))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=5)
+    yield conn
+    conn.close()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(conn, method, path, body=None):
+    conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read() or b"null")
+
+
+def test_batched_post_is_written(http_conn, writer, db_path):
+    body = json.dumps([sample_record(f"esp-{i % 3}") for i in range(500)])
+    for _ in range(4):
+        assert request(http_conn, "POST", "/telemetria", body) == (202, {"aceitos": 500})
+    assert wait_until(lambda: writer.written == 2000)
+    assert count_rows(db_path) == 2000
+
+
+def test_read_after_write_through_local_client(http_conn, db_path):
+    status, _ = request(http_conn, "POST", "/telemetria", json.dumps(sample_record("fresh")))
+    assert status == 202
+    assert wait_until(lambda: not get_station_details(db_path, "fresh", 1).empty, timeout=1.0)
+    details = get_station_details(db_path, "fresh", 1)
+    assert details.iloc[0]["temperatura"] == 25.0
+    assert details.iloc[0]["fonte_localizacao"] == "gps"
+    stations = get_all_stations_latest_data(db_path)
+    assert list(stations["device_id"]) == ["fresh"]
+
+
+@pytest.mark.parametrize("body", [
+    '{"device_id": "bad", "time": Infinity}',
+    '{"device_id": "bad", "time": "Infinity"}',
+    '{"device_id": "bad", "time": 1e400}',
+    '{"device_id": "bad", "time": 1e30}',
+    '{"device_id": "bad", "time": 1e15}',
+    '{"device_id": "bad", "time": -1e15}',
+    '{"device_id": "bad", "time": "9999-12-31"}',
+    '{"device_id": "bad", "temperatura": NaN}',
+    '{"device_id": "bad", "temperatura": "nan"}',
+    '{"temperatura": 20}',
+])
+def test_invalid_records_are_rejected(http_conn, body):
+    status, response = request(http_conn, "POST", "/telemetria", body)
+    assert status == 400
+    assert "erro" in response
+
+
+def test_rejected_record_rejects_whole_request(http_conn, writer):
+    body = json.dumps([sample_record("ok"), sample_record("bad", time=1e15)])
+    assert request(http_conn, "POST", "/telemetria", body)[0] == 400
+    assert writer.pending() == 0 and writer.written == 0
+
+
+def test_time_window():
+    now_ms = int(time.time() * 1000)
+    assert normalize_record(sample_record("a", time=now_ms))[0] == now_ms
+    assert normalize_record(sample_record("a", time=now_ms / 1000))[0] == pytest.approx(now_ms, abs=1)
+    with pytest.raises(ValueError):
+        normalize_record(sample_record("a", time=now_ms + 3600 * 1000))
+
+
+def test_keep_alive_after_unknown_route(http_conn):
+    status, _ = request(http_conn, "POST", "/rota-inexistente", '{"device_id": "x"}')
+    assert status == 404
+    status, health = request(http_conn, "GET", "/health")
+    assert status == 200
+    assert health["ativo"] is True
+
+
+def test_poisoned_row_does_not_drop_batch(monkeypatch, db_path):
+    # Simula um registro que passa na validação mas falha na gravação
+    poison = (2**70, "poison") + (None,) * 8
+    monkeypatch.setattr(server, "normalize_record",
+                        lambda payload: payload if isinstance(payload, tuple) else normalize_record(payload))
+    writer = BatchWriter(db_path=db_path, flush_interval=0.2).start()
+    try:
+        good = [sample_record(f"ok-{i}") for i in range(5)]
+        assert writer.submit(good[:2] + [poison] + good[2:]) == 6
+        assert wait_until(lambda: writer.written + writer.failed == 6)
+    finally:
+        writer.stop()
+    assert writer.written == 5
+    assert writer.failed == 1
+    assert count_rows(db_path) == 5
+
+
+def test_locked_database_is_retried_and_queue_is_all_or_nothing(monkeypatch, db_path):
+    monkeypatch.setattr(server, "connect", functools.partial(connect, timeout=0.05))
+    writer = BatchWriter(db_path=db_path, batch_size=1, maxsize=2).start()
+    lock = local_store.connect(db_path)
+    lock.execute("BEGIN IMMEDIATE")
+    try:
+        assert writer.submit([sample_record("a")]) == 1
+        # A thread de gravação retira o registro e fica repetindo a gravação
+        assert wait_until(lambda: writer.pending() == 0)
+        assert writer.submit([sample_record("b"), sample_record("c")]) == 2
+        assert writer.submit([sample_record("d")]) == 0
+        with pytest.raises(ValueError):
+            writer.submit([sample_record("e")] * 3)
+        assert writer.pending() == 2
+        time.sleep(0.3)
+    finally:
+        lock.rollback()
+        lock.close()
+    try:
+        assert wait_until(lambda: writer.written == 3)
+    finally:
+        writer.stop()
+    assert writer.failed == 0
+    assert count_rows(db_path) == 3
+
+
+def test_dashboard_ignores_out_of_range_rows(db_path):
+    conn = connect(db_path)
+    local_store.init_schema(conn)
+    good = normalize_record(sample_record("good"))
+    # Linha gravada antes da validação de janela de tempo, por exemplo
+    future = (253402214400000, "good") + good[2:]
+    far_future = (10**18, "other") + good[2:]
+    insert_rows(conn, [good, future, far_future])
+    conn.close()
+
+    stations = get_all_stations_latest_data(db_path)
+    assert list(stations["device_id"]) == ["good"]
+    details = get_station_details(db_path, "good", 1)
+    assert len(details) == 1